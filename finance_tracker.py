@@ -1,9 +1,64 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import numpy as np
 import plotly.graph_objects as go
+import pyarrow as pa
+import pyarrow.parquet as pq
 from datetime import datetime
 import json
+import os
+import glob
+import time
+import uuid
+import threading
+import contextlib
+
+# Saving transactions to disk is off unless this environment variable names a
+# directory. Each added transaction is saved there as its own small Parquet
+# file, and the files are merged into one when a session loads them. Every
+# session of the app reads and writes that same directory, so anyone who can
+# open the app sees all of it; only enable it for a single-user deployment
+DATA_DIR_ENV = 'FINANCE_TRACKER_DATA_DIR'
+
+# Column types every part file is written with; parts are cast to it on load
+# so one file's inferred types can never decide how the others are read
+TRANSACTIONS_SCHEMA = pa.schema([
+    ('date', pa.timestamp('ns')),
+    ('amount', pa.float64()),
+    ('category', pa.dictionary(pa.int8(), pa.string())),
+    ('description', pa.string())
+])
+
+def _transactions_dir():
+    """Return the directory transactions are saved to, or None if saving is off."""
+    return os.environ.get(DATA_DIR_ENV) or None
+
+@st.cache_resource
+def _store_lock():
+    """Return the lock that serializes loading and merging saved transactions."""
+    # Sessions run as threads of one server process and this script is
+    # re-executed on every rerun, so the lock is held in st.cache_resource
+    # rather than a module global. Separate server processes are not covered
+    return threading.Lock()
+
+def _build_comparison_fig(year, month, spending, budgets, categories):
+    """Build the spending vs budget bar chart."""
+    # Traces and layout are passed as plain dicts in one constructor call, so
+    # each build validates the figure once rather than again in update_layout.
+    # main keeps the built Figure per session, and st.plotly_chart does not
+    # re-validate Figure objects, so a rerun with unchanged inputs skips both
+    return go.Figure(
+        data=[
+            {'type': 'bar', 'name': 'Spending', 'x': categories, 'y': spending},
+            {'type': 'bar', 'name': 'Budget', 'x': categories, 'y': budgets}
+        ],
+        layout={
+            'title': {'text': f'Monthly Spending vs Budget ({datetime(year, month, 1).strftime("%B %Y")})'},
+            'barmode': 'group',
+            'xaxis': {'title': {'text': 'Categories'}},
+            'yaxis': {'title': {'text': 'Amount ($)'}}
+        }
+    )
 
 class FinanceTracker:
     def __init__(self):
@@ -11,88 +66,383 @@ class FinanceTracker:
             'Housing', 'Transportation', 'Food', 'Utilities', 
             'Healthcare', 'Entertainment', 'Shopping', 'Other'
         ]
+        # Categories are stored as these integer codes and mapped back to
+        # names only for display
+        self.category_index = {cat: i for i, cat in enumerate(self.categories)}
         
         # Initialize session state if not already present
+        # Transactions are stored column-wise in typed NumPy buffers that grow
+        # geometrically; only the first tx_count rows are populated, kept in
+        # ascending date order. Amounts are whole cents so sums are exact
         if 'transactions' not in st.session_state:
-            st.session_state.transactions = []
+            st.session_state.transactions = {
+                'date': np.empty(0, dtype='datetime64[ns]'),
+                'month_key': np.empty(0, dtype=np.int32),
+                'category': np.empty(0, dtype=np.int8),
+                'amount_cents': np.empty(0, dtype=np.int64)
+            }
+            st.session_state.tx_count = 0
+            # Free-text descriptions are only displayed, never aggregated, so
+            # they sit in a parallel list outside the numeric buffers
+            st.session_state.descriptions = []
+        
+        # Budgets are stored under the budget widgets' own keys
+        for cat in self.categories:
+            if f'budget_{cat}' not in st.session_state:
+                st.session_state[f'budget_{cat}'] = 0.0
+        
+        # Per-category spending arrays keyed by (year, month), built for all
+        # months on first lookup and kept current by add_transaction; None
+        # means they need rebuilding
+        if 'monthly_totals' not in st.session_state:
+            st.session_state.monthly_totals = None
+        
+        # Bumped on every new transaction so derived data can be reused between reruns
+        if 'tx_version' not in st.session_state:
+            st.session_state.tx_version = 0
         
-        if 'budgets' not in st.session_state:
-            st.session_state.budgets = {cat: 0.0 for cat in self.categories}
+        # Bumped whenever a budget changes, for the same reason
+        if 'budget_version' not in st.session_state:
+            st.session_state.budget_version = 0
+        
+        # Restore transactions saved by earlier sessions
+        # (marked first, so a load that fails part way is never repeated and
+        # cannot append the same rows twice)
+        if 'tx_loaded' not in st.session_state:
+            st.session_state.tx_loaded = True
+            self._load_transactions()
     
     def add_transaction(self, date, amount, category, description):
         """Add a new transaction to the tracker."""
         try:
-            transaction = {
-                'date': date,
-                'amount': float(amount),
-                'category': category,
-                'description': description
-            }
-            st.session_state.transactions.append(transaction)
-            return True
+            amount_cents = int(round(float(amount) * 100))
         except ValueError:
             st.error("Invalid amount entered")
             return False
+        
+        date = pd.Timestamp(date)
+        category_code = self.category_index[category]
+        
+        # Save first so a failed write leaves nothing in memory that is not
+        # also on disk
+        try:
+            self._write_part(self._make_df(
+                np.array([date.to_datetime64()], dtype='datetime64[ns]'),
+                np.array([amount_cents], dtype=np.int64),
+                np.array([category_code], dtype=np.int8),
+                [description]
+            ))
+        except (OSError, ValueError) as err:
+            st.error(f"Could not save transaction: {err}")
+            return False
+        
+        self._reserve(1)
+        transactions = st.session_state.transactions
+        count = st.session_state.tx_count
+        row = count
+        # New entries are usually the latest, making this an append; a
+        # back-dated one shifts the later rows up by one instead
+        if count and transactions['date'][count - 1] > date.to_datetime64():
+            row = np.searchsorted(
+                transactions['date'][:count], date.to_datetime64(), side='right'
+            )
+            for buffer in transactions.values():
+                buffer[row + 1:count + 1] = buffer[row:count]
+        
+        transactions['date'][row] = date.to_datetime64()
+        transactions['month_key'][row] = date.year * 12 + date.month
+        transactions['category'][row] = category_code
+        transactions['amount_cents'][row] = amount_cents
+        st.session_state.descriptions.insert(row, description)
+        st.session_state.tx_count = count + 1
+        
+        monthly_totals = st.session_state.monthly_totals
+        if monthly_totals is not None:
+            totals = monthly_totals.setdefault(
+                (date.year, date.month), np.zeros(len(self.categories), dtype=np.int64)
+            )
+            totals[category_code] += amount_cents
+        st.session_state.tx_version += 1
+        return True
     
-    def update_budget(self, category, amount):
-        """Update monthly budget for a category."""
+    def add_transactions(self, dates, amounts, categories, descriptions):
+        """Add many transactions at once, converting each column in one step."""
         try:
-            st.session_state.budgets[category] = float(amount)
+            dates = pd.to_datetime(pd.Series(dates)).to_numpy(dtype='datetime64[ns]')
+            amounts = np.asarray(amounts, dtype=np.float64)
+        except (ValueError, TypeError):
+            st.error("Invalid dates or amounts in import")
+            return False
+        
+        category_codes = pd.Categorical(categories, categories=self.categories).codes
+        if np.isnat(dates).any() or not np.isfinite(amounts).all() or (category_codes < 0).any():
+            st.error("Import has missing dates or amounts, or unknown categories")
+            return False
+        if not len(dates):
             return True
-        except ValueError:
-            st.error(f"Invalid budget amount for {category}")
+        
+        amounts_cents = np.rint(amounts * 100).astype(np.int64)
+        # Imported descriptions may be numbers (check or reference numbers)
+        # or missing; they are stored as text like the ones typed in
+        descriptions = ['' if pd.isna(d) else str(d) for d in descriptions]
+        
+        # Save first so a failed write leaves nothing in memory that is not
+        # also on disk
+        try:
+            self._write_part(
+                self._make_df(dates, amounts_cents, category_codes, descriptions)
+            )
+        except (OSError, ValueError) as err:
+            st.error(f"Could not save imported transactions: {err}")
             return False
-    
-    def get_monthly_spending(self, year, month):
-        """Calculate total spending per category for a specific month."""
-        if not st.session_state.transactions:
-            return pd.DataFrame(columns=['category', 'amount'])
         
-        df = pd.DataFrame(st.session_state.transactions)
-        df['date'] = pd.to_datetime(df['date'])
-        monthly_mask = (df['date'].dt.year == year) & (df['date'].dt.month == month)
-        monthly_spending = df[monthly_mask].groupby('category')['amount'].sum().reset_index()
-        return monthly_spending
+        self._append_rows(dates, amounts_cents, category_codes, descriptions)
+        return True
     
-    def plot_monthly_comparison(self, year, month):
-        """Create a bar chart comparing spending vs budget for each category."""
-        monthly_spending = self.get_monthly_spending(year, month)
+    def _append_rows(self, dates, amounts_cents, category_codes, descriptions):
+        """Append whole columns of transactions to the buffers at once."""
+        count = len(dates)
+        self._reserve(count)
+        transactions = st.session_state.transactions
+        start = st.session_state.tx_count
+        rows = slice(start, start + count)
+        transactions['date'][rows] = dates
+        # datetime64[M] counts months since 1970-01; shift to year * 12 + month
+        transactions['month_key'][rows] = (
+            transactions['date'][rows].astype('datetime64[M]').astype(np.int32)
+            + 1970 * 12 + 1
+        )
+        transactions['category'][rows] = category_codes
+        transactions['amount_cents'][rows] = amounts_cents
+        st.session_state.descriptions.extend(descriptions)
+        st.session_state.tx_count = start + count
         
-        categories = []
-        spending = []
-        budgets = []
+        # Restore date order if the new rows are not already the latest
+        dates = transactions['date'][:start + count]
+        checked = dates[max(start - 1, 0):]
+        if np.any(checked[1:] < checked[:-1]):
+            order = np.argsort(dates, kind='stable')
+            for buffer in transactions.values():
+                buffer[:start + count] = buffer[:start + count][order]
+            descriptions = st.session_state.descriptions
+            descriptions[:] = [descriptions[i] for i in order.tolist()]
         
-        for category in self.categories:
-            categories.append(category)
+        st.session_state.monthly_totals = None
+        st.session_state.tx_version += 1
+    
+    def _load_transactions(self):
+        """Load saved transactions into the buffers, if saving is on."""
+        directory = _transactions_dir()
+        if directory is None:
+            return
+        
+        with _store_lock():
+            parts = sorted(glob.glob(os.path.join(directory, '*.parquet')))
+            if not parts:
+                return
             
-            # Get spending for category (0.0 if no spending)
-            cat_spending = monthly_spending[
-                monthly_spending['category'] == category
-            ]['amount'].sum() if not monthly_spending.empty else 0.0
-            spending.append(float(cat_spending))
+            # Read exactly the globbed files, not the whole directory, so a
+            # part written after the glob is neither merged nor deleted. A
+            # file that cannot be read is reported and left where it is
+            tables = []
+            readable = []
+            for part in parts:
+                try:
+                    tables.append(
+                        pq.read_table(part, columns=TRANSACTIONS_SCHEMA.names)
+                        .cast(TRANSACTIONS_SCHEMA)
+                    )
+                except (OSError, pa.ArrowException) as err:
+                    st.error(f"Could not read saved transactions in {part}: {err}")
+                    continue
+                readable.append(part)
+            if not tables:
+                return
+            df = pa.concat_tables(tables).to_pandas()
             
-            # Get budget for category (0.0 if not set)
-            budget = float(st.session_state.budgets.get(category, 0.0))
-            budgets.append(budget)
-        
-        fig = go.Figure(data=[
-            go.Bar(name='Spending', x=categories, y=spending),
-            go.Bar(name='Budget', x=categories, y=budgets)
-        ])
-        
-        fig.update_layout(
-            title=f'Monthly Spending vs Budget ({datetime(year, month, 1).strftime("%B %Y")})',
-            barmode='group',
-            xaxis_title='Categories',
-            yaxis_title='Amount ($)'
+            # Merge the per-transaction files so the next load reads just one
+            if len(readable) > 1:
+                self._merge_parts(df, readable)
+        
+        # The buffers are filled only once the files on disk are settled
+        self._append_rows(
+            df['date'].to_numpy(dtype='datetime64[ns]'),
+            np.rint(df['amount'].to_numpy(dtype=np.float64) * 100).astype(np.int64),
+            pd.Categorical(df['category'], categories=self.categories).codes,
+            df['description'].fillna('').tolist()
+        )
+    
+    def _merge_parts(self, df, parts):
+        """Replace the given part files with one file holding all of `df`."""
+        try:
+            merged = self._write_part(df)
+        except (OSError, ValueError):
+            # Compaction is only an optimization; the parts stay as they are
+            return
+        
+        for i, part in enumerate(parts):
+            try:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(part)
+            except OSError as err:
+                # Whatever is left on disk besides the merged file repeats
+                # its rows; with nothing removed yet, dropping the merged
+                # file restores the previous state instead
+                leftovers = parts[i:]
+                if i == 0:
+                    try:
+                        os.remove(merged)
+                        return
+                    except OSError:
+                        leftovers = [merged]
+                st.error(
+                    'Could not finish merging saved transactions; delete '
+                    f"{', '.join(leftovers)} to avoid duplicates: {err}"
+                )
+                return
+    
+    def _write_part(self, df):
+        """Save a frame of transactions as a new file and return its path, if saving is on."""
+        directory = _transactions_dir()
+        if directory is None:
+            return
+        
+        os.makedirs(directory, exist_ok=True)
+        name = f'{time.time_ns()}-{uuid.uuid4().hex}.parquet'
+        path = os.path.join(directory, name)
+        # Write under a hidden name that loading skips, then rename, so a
+        # concurrent load never sees a half-written file
+        temp_path = os.path.join(directory, f'.{name}.tmp')
+        try:
+            df.to_parquet(temp_path, index=False, schema=TRANSACTIONS_SCHEMA)
+            os.replace(temp_path, path)
+        except Exception:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temp_path)
+            raise
+        return path
+    
+    def _reserve(self, extra):
+        """Make room for `extra` more transactions, doubling buffer capacity as needed."""
+        transactions = st.session_state.transactions
+        count = st.session_state.tx_count
+        capacity = len(transactions['date'])
+        if count + extra <= capacity:
+            return
+        
+        capacity = max(count + extra, 2 * capacity, 64)
+        for column, buffer in transactions.items():
+            grown = np.empty(capacity, dtype=buffer.dtype)
+            grown[:count] = buffer[:count]
+            transactions[column] = grown
+    
+    def bump_budget_version(self):
+        """Record that a budget changed so the cached chart is redrawn."""
+        st.session_state.budget_version += 1
+    
+    def get_transactions_df(self):
+        """Return date, amount and category of all transactions, rebuilt only when they change."""
+        if st.session_state.get('tx_df_version') != st.session_state.tx_version:
+            # The date column is a view of the date buffer, which back-dated
+            # inserts shift in place, so the frame is rebuilt on every change
+            st.session_state.tx_df = self._rows_df(slice(0, st.session_state.tx_count))
+            st.session_state.tx_df_version = st.session_state.tx_version
+        return st.session_state.tx_df
+    
+    def _rows_df(self, rows, with_descriptions=False):
+        """Build a DataFrame from a slice of the typed buffers with no dtype inference."""
+        transactions = st.session_state.transactions
+        return self._make_df(
+            transactions['date'][rows],
+            transactions['amount_cents'][rows],
+            transactions['category'][rows],
+            st.session_state.descriptions[rows] if with_descriptions else None
         )
+    
+    def _make_df(self, dates, amounts_cents, category_codes, descriptions=None):
+        """Build a transactions DataFrame in dollars from typed column arrays.
         
-        return fig
+        Only `dates` is used without copying; amounts and categories are
+        converted into new arrays.
+        """
+        columns = {
+            'date': dates,
+            'amount': amounts_cents / 100,
+            'category': pd.Categorical.from_codes(category_codes, categories=self.categories)
+        }
+        if descriptions is not None:
+            columns['description'] = descriptions
+        return pd.DataFrame(columns, copy=False)
+    
+    def get_monthly_spending(self, year, month):
+        """Calculate total spending per category for a specific month."""
+        return pd.DataFrame({
+            'category': self.categories,
+            'amount': self._monthly_totals(year, month) / 100
+        })
+    
+    def _monthly_totals(self, year, month):
+        """Return spending in cents for a month, aligned with self.categories."""
+        if st.session_state.monthly_totals is None:
+            st.session_state.monthly_totals = self._build_monthly_totals()
+        
+        totals = st.session_state.monthly_totals.get((year, month))
+        if totals is None:
+            return np.zeros(len(self.categories), dtype=np.int64)
+        return totals
+    
+    def _build_monthly_totals(self):
+        """Sum spending for every month and category in one pass over the buffers."""
+        transactions = st.session_state.transactions
+        count = st.session_state.tx_count
+        if not count:
+            return {}
+        
+        # Rows are in date order, so the month keys are sorted; each row maps
+        # to one (month, category) bin and a single weighted bincount fills them
+        n_categories = len(self.categories)
+        keys = transactions['month_key'][:count]
+        first = int(keys[0])
+        bins = (keys - first) * n_categories + transactions['category'][:count]
+        # bincount accumulates weights as float64, which is exact for whole
+        # cents below 2**53, so the result converts back to int64 losslessly
+        sums = np.bincount(
+            bins,
+            weights=transactions['amount_cents'][:count],
+            minlength=(int(keys[-1]) - first + 1) * n_categories
+        ).astype(np.int64).reshape(-1, n_categories)
+        
+        monthly_totals = {}
+        for key in np.unique(keys).tolist():
+            year, month = divmod(key - 1, 12)
+            monthly_totals[(year, month + 1)] = sums[key - first]
+        return monthly_totals
+    
+    def plot_monthly_comparison(self, year, month):
+        """Create a bar chart comparing spending vs budget for each category."""
+        # Read the totals array directly; building the spending DataFrame only
+        # to turn it back into a list costs more than the sums themselves
+        categories = self.categories
+        spending = (self._monthly_totals(year, month) / 100).tolist()
+        budgets = [float(st.session_state[f'budget_{c}']) for c in categories]
+        
+        return _build_comparison_fig(year, month, spending, budgets, categories)
 
 def main():
     st.title('Personal Finance Tracker')
     tracker = FinanceTracker()
     
+    if _transactions_dir() is None:
+        st.caption(
+            'Transactions are kept for this browser session only. Set '
+            f'{DATA_DIR_ENV} to a directory to save them.'
+        )
+    else:
+        st.warning(
+            f'Transactions are saved to {_transactions_dir()} and shared by '
+            'everyone who opens this app.'
+        )
+    
     # Sidebar for adding transactions
     with st.sidebar:
         st.header('Add New Transaction')
@@ -109,19 +459,43 @@ def main():
             if tracker.add_transaction(date, amount, category, description):
                 st.success('Transaction added successfully!')
         
+        st.header('Import Transactions')
+        uploaded = st.file_uploader(
+            'Import CSV (date, amount, category, description)', type='csv'
+        )
+        if uploaded is not None and st.button('Import Transactions'):
+            try:
+                # Read descriptions as text so numeric ones keep their exact form
+                imported = pd.read_csv(uploaded, dtype={'description': str})
+            except (
+                pd.errors.ParserError, pd.errors.EmptyDataError,
+                UnicodeDecodeError, ValueError
+            ) as err:
+                st.error(f"Could not read CSV: {err}")
+            else:
+                missing = {'date', 'amount', 'category'} - set(imported.columns)
+                if missing:
+                    st.error(f"CSV is missing columns: {', '.join(sorted(missing))}")
+                elif tracker.add_transactions(
+                    imported['date'],
+                    imported['amount'],
+                    imported['category'],
+                    imported['description']
+                    if 'description' in imported else [''] * len(imported)
+                ):
+                    st.success(f'Imported {len(imported)} transactions!')
+        
         st.header('Set Monthly Budgets')
         for category in tracker.categories:
-            budget_value = float(st.session_state.budgets.get(category, 0.0))
-            new_budget = st.number_input(
+            # The widget writes straight to st.session_state[f'budget_{category}']
+            st.number_input(
                 f'{category} Budget ($)',
                 min_value=0.0,
-                value=budget_value,
                 step=0.01,
                 key=f'budget_{category}',
-                format="%.2f"
+                format="%.2f",
+                on_change=tracker.bump_budget_version
             )
-            if new_budget != budget_value:
-                tracker.update_budget(category, new_budget)
     
     # Main content area
     current_year = datetime.now().year
@@ -129,14 +503,32 @@ def main():
     
     # Display monthly comparison chart
     st.header('Monthly Spending vs Budget')
-    comparison_chart = tracker.plot_monthly_comparison(current_year, current_month)
-    st.plotly_chart(comparison_chart)
+    # Only rebuild the chart when its inputs changed since the last rerun;
+    # typing in the sidebar otherwise leaves all of them untouched
+    chart_key = (
+        st.session_state.tx_version, st.session_state.budget_version,
+        current_year, current_month
+    )
+    if st.session_state.get('chart_key') != chart_key:
+        st.session_state.chart = tracker.plot_monthly_comparison(current_year, current_month)
+        st.session_state.chart_key = chart_key
+    st.plotly_chart(st.session_state.chart)
     
     # Display recent transactions
     st.header('Recent Transactions')
-    if st.session_state.transactions:
-        df = pd.DataFrame(st.session_state.transactions)
-        df = df.sort_values('date', ascending=False)
+    if st.session_state.tx_count:
+        rows_to_show = st.number_input(
+            'Rows to show',
+            min_value=1,
+            max_value=st.session_state.tx_count,
+            value=min(50, st.session_state.tx_count),
+            step=10
+        )
+        # Rows are kept in date order, so the newest ones are at the end;
+        # only send the requested slice to the browser
+        df = tracker.get_transactions_df().iloc[:-rows_to_show - 1:-1]
+        descriptions = st.session_state.descriptions
+        df = df.assign(description=[descriptions[i] for i in df.index])
         st.dataframe(df)
     else:
         st.info('No transactions recorded yet.')
@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Turn on saving to a fresh directory for the duration of a test."""
+    path = tmp_path / 'transactions'
+    monkeypatch.setenv('FINANCE_TRACKER_DATA_DIR', str(path))
+    return path
@@ -0,0 +1,185 @@
+import threading
+
+from streamlit.testing.v1 import AppTest
+
+import finance_tracker
+
+
+def _add_rows(rows):
+    """App script that adds `rows` one at a time on its first run."""
+    import streamlit as st
+    from finance_tracker import FinanceTracker
+
+    tracker = FinanceTracker()
+    if 'added' not in st.session_state:
+        st.session_state.added = [tracker.add_transaction(*row) for row in rows]
+
+
+def _import_rows(csv):
+    """App script that imports a CSV text in one batch on its first run."""
+    import io
+
+    import pandas as pd
+    import streamlit as st
+    from finance_tracker import FinanceTracker
+
+    tracker = FinanceTracker()
+    if 'added' not in st.session_state:
+        df = pd.read_csv(io.StringIO(csv), dtype={'description': str})
+        st.session_state.added = tracker.add_transactions(
+            df['date'], df['amount'], df['category'], df['description']
+        )
+
+
+def _load():
+    """App script that only loads the saved transactions."""
+    from finance_tracker import FinanceTracker
+
+    FinanceTracker()
+
+
+def _run(script, **kwargs):
+    at = AppTest.from_function(script, kwargs=kwargs or None)
+    at.run()
+    assert not at.exception
+    return at
+
+
+def _saved_rows(at):
+    count = at.session_state['tx_count']
+    transactions = at.session_state['transactions']
+    return (
+        [str(d)[:10] for d in transactions['date'][:count]],
+        transactions['amount_cents'][:count].tolist(),
+        at.session_state['descriptions'][:count],
+    )
+
+
+def _parts(data_dir):
+    return sorted(data_dir.glob('*.parquet'))
+
+
+def test_back_dated_insert_keeps_date_order(data_dir):
+    at = _run(_add_rows, rows=[
+        ('2026-10-03', 3, 'Food', 'c'),
+        ('2026-10-01', 1, 'Food', 'a'),
+        ('2026-10-02', 2, 'Housing', 'b'),
+    ])
+    assert at.session_state['added'] == [True, True, True]
+    assert _saved_rows(at) == (
+        ['2026-10-01', '2026-10-02', '2026-10-03'],
+        [100, 200, 300],
+        ['a', 'b', 'c'],
+    )
+
+
+def test_amounts_sum_exactly_in_cents():
+    at = _run(_add_rows, rows=[
+        ('2026-10-01', 0.1, 'Food', ''),
+        ('2026-10-02', 0.2, 'Food', ''),
+    ])
+    assert sum(_saved_rows(at)[1]) == 30
+
+
+def test_saving_is_off_without_data_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv('FINANCE_TRACKER_DATA_DIR', raising=False)
+    monkeypatch.chdir(tmp_path)
+    _run(_add_rows, rows=[('2026-10-01', 1, 'Food', 'a')])
+    assert list(tmp_path.iterdir()) == []
+    assert _run(_load).session_state['tx_count'] == 0
+
+
+def test_reload_loads_each_row_once_and_merges_parts(data_dir):
+    rows = [('2026-10-0%d' % day, day, 'Food', 'd%d' % day) for day in (3, 1, 2)]
+    _run(_add_rows, rows=rows)
+    assert len(_parts(data_dir)) == 3
+
+    at = _run(_load)
+    expected = (['2026-10-01', '2026-10-02', '2026-10-03'], [100, 200, 300], ['d1', 'd2', 'd3'])
+    assert _saved_rows(at) == expected
+    assert len(_parts(data_dir)) == 1
+
+    at.run()
+    assert _saved_rows(at) == expected
+    assert _saved_rows(_run(_load)) == expected
+    assert len(_parts(data_dir)) == 1
+
+
+def test_parts_are_read_and_merged_under_the_store_lock(data_dir, monkeypatch):
+    # Sessions in one server process share the lock, so a second session
+    # cannot read the parts while the first is replacing them
+    _run(_add_rows, rows=[('2026-10-0%d' % day, day, 'Food', '') for day in range(1, 4)])
+    lock = threading.Lock()
+    held = []
+    read_table = finance_tracker.pq.read_table
+    merge_parts = finance_tracker.FinanceTracker._merge_parts
+
+    def locked_read_table(*args, **kwargs):
+        held.append(('read', lock.locked()))
+        return read_table(*args, **kwargs)
+
+    def locked_merge_parts(self, *args):
+        held.append(('merge', lock.locked()))
+        return merge_parts(self, *args)
+
+    monkeypatch.setattr(finance_tracker, '_store_lock', lambda: lock)
+    monkeypatch.setattr(finance_tracker.pq, 'read_table', locked_read_table)
+    monkeypatch.setattr(finance_tracker.FinanceTracker, '_merge_parts', locked_merge_parts)
+
+    assert _run(_load).session_state['tx_count'] == 3
+    assert held == [('read', True)] * 3 + [('merge', True)]
+    assert not lock.locked()
+
+
+def test_failed_save_leaves_transactions_unchanged(tmp_path, monkeypatch):
+    # A regular file where the data directory should be makes every write fail
+    blocker = tmp_path / 'blocker'
+    blocker.write_text('')
+    monkeypatch.setenv('FINANCE_TRACKER_DATA_DIR', str(blocker))
+
+    at = _run(_add_rows, rows=[('2026-10-01', 1, 'Food', 'a')])
+    assert at.session_state['added'] == [False]
+    assert at.session_state['tx_count'] == 0
+    assert at.session_state['tx_version'] == 0
+    assert at.session_state['descriptions'] == []
+    assert any('Could not save transaction' in e.value for e in at.error)
+
+    at = _run(_import_rows, csv='date,amount,category,description\n2026-10-01,1,Food,a\n')
+    assert at.session_state['added'] is False
+    assert at.session_state['tx_count'] == 0
+    assert at.session_state['tx_version'] == 0
+
+
+def test_failed_merge_does_not_duplicate_rows(data_dir, monkeypatch):
+    _run(_add_rows, rows=[('2026-10-02', 2, 'Food', 'b'), ('2026-10-01', 1, 'Food', 'a')])
+    parts = _parts(data_dir)
+
+    def fail(self, df):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(finance_tracker.FinanceTracker, '_write_part', fail)
+    at = AppTest.from_function(_load)
+    for _ in range(3):
+        at.run()
+        assert not at.exception
+        assert _saved_rows(at) == (['2026-10-01', '2026-10-02'], [100, 200], ['a', 'b'])
+    assert _parts(data_dir) == parts
+
+
+def test_unreadable_part_is_reported_and_skipped(data_dir):
+    _run(_add_rows, rows=[('2026-10-01', 1, 'Food', 'a')])
+    (data_dir / 'zz-bad.parquet').write_text('not parquet')
+
+    at = _run(_load)
+    assert at.session_state['tx_count'] == 1
+    assert any('zz-bad.parquet' in e.value for e in at.error)
+
+
+def test_imported_numeric_descriptions_survive_reload(data_dir):
+    _run(_import_rows, csv=(
+        'date,amount,category,description\n'
+        '2026-10-02,2.5,Food,123\n'
+        '2026-10-01,1,Housing,\n'
+    ))
+    at = _run(_load)
+    assert _saved_rows(at) == (['2026-10-01', '2026-10-02'], [100, 250], ['', '123'])